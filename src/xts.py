@@ -34,11 +34,11 @@ The script utilizes the `yaml_runner` module to handle configuration
 parsing and command execution.
 """
 
+import copy
 import os
-import re
 import sys
+from types import MappingProxyType
 
-import rich
 import yaml
 try:
     from yaml import CSafeLoader as SafeLoader
@@ -47,6 +47,12 @@ except ImportError:
 
 from yaml_runner import YamlRunner, add_choices_to_help
 
+_USING_C_YAML = SafeLoader.__name__ == 'CSafeLoader'
+_yaml_fallback_reported = False
+_XTS_CACHE_SIZE = 8
+_XTS_SEEN = object()
+_xts_cache = {}
+
 class XTS(YamlRunner):
     """
     XTS class for managing XTS configuration and running commands.
@@ -57,6 +63,9 @@ class XTS(YamlRunner):
     Attributes:
         _xts_config (dict, optional): The internal dictionary containing the
             parsed XTS configuration data. Defaults to None.
+        _xts_config_view (MappingProxyType, optional): Top-level read-only
+            view of `_xts_config` returned by the `xts_config` property.
+            Defaults to None.
     """
 
 
@@ -66,11 +75,17 @@ class XTS(YamlRunner):
         """
         super().__init__(program='xts')
         self._xts_config = None
+        self._xts_config_view = None
 
     @property
     def xts_config(self):
-        """Returns a copy of the currently loaded XTS configuration."""
-        return self._xts_config
+        """
+        Returns a read-only view of the currently loaded XTS configuration.
+
+        Only the top level is read-only; the command sections are the
+        instance's own copies and can still be modified.
+        """
+        return self._xts_config_view
 
     @xts_config.setter
     def xts_config(self, config:str):
@@ -84,14 +99,20 @@ class XTS(YamlRunner):
         Raises:
             SystemExit: if the file cannot be read or other errors during loading.
         """
-        if os.path.exists(config) and re.search(r'.xts$',config):
-            try:
-                with open(config, 'r', encoding='utf-8') as config_stream:
-                    self._xts_config = yaml.load(config_stream,SafeLoader)
-            except PermissionError:
-                error(f'Could not read xts config: [{config}]')
-        else:
+        if not _is_xts(config):
             error('xts config specified does not exist')
+        try:
+            config_stat = os.stat(config)
+            self._xts_config = _load_xts(os.path.abspath(config),
+                                         config_stat.st_mtime_ns,
+                                         config_stat.st_size)
+        except PermissionError:
+            error(f'Could not read xts config: [{config}]')
+        except OSError:
+            error('xts config specified does not exist')
+        if not isinstance(self._xts_config, dict):
+            error(f'xts config is not a valid mapping: [{config}]')
+        self._xts_config_view = MappingProxyType(self._xts_config)
 
     def _parse_first_arg(self):
         """
@@ -105,13 +126,47 @@ class XTS(YamlRunner):
         Returns:
          list : remaining arguments after parsing the first argument.
         """
-        if len(sys.argv) > 1:
-            if re.search(r'.xts$',sys.argv[1]):
-                self.xts_config = sys.argv[1]
-                self._used_args.append(sys.argv[1])
-                sys.argv.pop(1)
+        argv = sys.argv[1:]
+        if argv and _is_xts(argv[0]):
+            self.xts_config = argv[0]
+            # Recorded straight away rather than batched with the command,
+            # as the parser built below takes its prog from _used_args
+            self._used_args.append(argv[0])
+            argv = argv[1:]
         if self.xts_config is None:
             self._find_xts_config()
+        parser = self._first_arg_parser(self._xts_config)
+        parsed_args, remaining = parser.parse_known_args(argv)
+        command = sys.intern(parsed_args.command)
+        # Validate against the config directly rather than through argparse
+        # choices, which checks membership with a linear scan of the list
+        if command not in self._xts_config:
+            choices = ', '.join(repr(choice) for choice in self._xts_config)
+            parser.error(f'argument COMMAND: invalid choice: {command!r} '
+                         f'(choose from {choices})')
+        section = self._xts_config[command]
+        self.config = {command : section}
+        # Now the command is known we can run a plugin an interrupt the run sequence
+        self._run_plugins(command)
+        self._used_args.append(command)
+        if parsed_args.help:
+            remaining.append('--help')
+        # If first argument isn't a whole section but just a command
+        # add the argument back into the argument list
+        if section.get('command'):
+            remaining.append(command)
+        return remaining
+
+    def _first_arg_parser(self, commands):
+        """
+        Builds the parser used to read the first positional argument.
+
+        Args:
+            commands (dict): The loaded xts config, keyed by command name.
+
+        Returns:
+            argparse.ArgumentParser: The parser for the first argument.
+        """
         parser = self.new_subparser(name='_parse_first_arg')
         parser.add_argument('--help','-h',
                             action='store_true',
@@ -120,44 +175,43 @@ class XTS(YamlRunner):
         parser.add_argument('command',
                             action='store',
                             help='The command to run',
-                            choices=list(self.xts_config.keys()),
                             default=None,
                             metavar='COMMAND')
-        help_msg = parser.format_help()
-        help_msg = add_choices_to_help(help_msg, 'COMMAND', list(self.xts_config.keys()))
-        parser.usage = help_msg
-        parsed_args, remaining = parser.parse_known_args()
-        self.config = {parsed_args.command : self._xts_config.get(parsed_args.command)}
-        # Now the command is known we can run a plugin an interrupt the run sequence
-        self._run_plugins(parsed_args.command)
-        self._used_args.append(parsed_args.command)
-        if parsed_args.help:
-            remaining.append('--help')
-        # If first argument isn't a whole section but just a command
-        # add the argument back into the argument list
-        if self.config[parsed_args.command].get('command'):
-            remaining.append(parsed_args.command)
-        return remaining
+        parser_error = parser.error
+
+        def error_with_help(message):
+            # The usage is only shown when argparse reports an error, so the
+            # help with the available commands is only rendered then
+            if parser.usage is None:
+                help_msg = parser.format_help()
+                parser.usage = add_choices_to_help(help_msg, 'COMMAND', list(commands))
+            parser_error(message)
+
+        parser.error = error_with_help
+        return parser
 
     def _find_xts_config(self):
         """
         Searches for an XTS configuration file in the current directory.
 
+        Candidates are matched on filename only; none of them are opened
+        while scanning and only the selected config is loaded.
+
         Raises:
             SystemExit: If no XTS configuration file is found.
         """
-        files = os.listdir(os.getcwd())
-        xts_configs = []
-        for filename in files:
-            regex = re.search(r'.xts$',filename)
-            if regex:
-                xts_configs.append(filename)
-        if len(xts_configs) > 1:
-            self._user_select_config(xts_configs)
-        elif len(xts_configs) < 1:
+        with os.scandir() as entries:
+            xts_configs = (entry.name for entry in entries
+                           if _is_xts(entry.name) and entry.is_file())
+            first = next(xts_configs, None)
+            second = next(xts_configs, None)
+            # The whole directory is still scanned, but the list of names is
+            # only built when there are several configs to choose from
+            if second is not None:
+                self._user_select_config([first, second, *xts_configs])
+        if first is None:
             error('no config found')
-        else:
-            self.xts_config = xts_configs[0]
+        self.xts_config = first
 
     def _user_select_config(self, choices):
         """
@@ -171,9 +225,8 @@ class XTS(YamlRunner):
             SystemExit: Exits with 2 exit code to allow user to re-run the script. 
         """
         info('Multiple xts file found in the current directory')
-        print('Please run one of the following commands to choose the file to use\n')
-        for filename in choices:
-            print(f'\txts {filename} ...')
+        commands = '\n'.join(f'\txts {filename} ...' for filename in choices)
+        print(f'Please run one of the following commands to choose the file to use\n\n{commands}')
         raise SystemExit(2)
 
     def _run_plugins(self,command):
@@ -202,18 +255,118 @@ class XTS(YamlRunner):
         return super().run(config=self.config, args=unparsed_args)
 
 
-def info(info_message):
+def _is_xts(filename):
+    """
+    Checks whether a filename has the xts config extension.
+
+    Args:
+        filename (str): The filename or path to check.
+
+    Returns:
+        bool: True if the filename ends with `.xts`, False otherwise.
+    """
+    return filename.endswith('.xts')
+
+def _load_xts(abspath, mtime_ns, size):
+    """
+    Loads an xts config file.
+
+    A file is only cached once it has been loaded a second time, keyed on
+    its path, modification time and size. A one-shot run therefore parses
+    the file once and makes no copy. Later loads of the unchanged file
+    skip the read and parse. Each of them gets its own deep copy of the
+    cached config, so changes made by one run do not leak into later loads.
+
+    Args:
+        abspath (str): Absolute path to the xts config file.
+        mtime_ns (int): Modification time of the file in nanoseconds.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        dict: The parsed xts config, with its command names interned.
+    """
+    cache_key = (abspath, mtime_ns, size)
+    cached = _xts_cache.pop(cache_key, None)
+    if cached is None:
+        # First load of this file, nothing is kept that the caller could modify
+        config = _parse_xts(abspath)
+        cached = _XTS_SEEN
+    else:
+        if cached is _XTS_SEEN:
+            cached = _parse_xts(abspath)
+        config = copy.deepcopy(cached)
+    _xts_cache[cache_key] = cached
+    while len(_xts_cache) > _XTS_CACHE_SIZE:
+        del _xts_cache[next(iter(_xts_cache))]
+    return config
+
+def _parse_xts(abspath):
+    """
+    Reads and parses an xts config file.
+
+    Args:
+        abspath (str): Absolute path to the xts config file.
+
+    Returns:
+        dict: The parsed xts config, with its command names interned.
+    """
+    _report_yaml_fallback()
+    with open(abspath, 'rb') as config_stream:
+        config_data = config_stream.read()
+    config = yaml.load(config_data, Loader=SafeLoader)
+    if not isinstance(config, dict):
+        return config
+    # Command names are looked up repeatedly, so intern them once here
+    return {sys.intern(key) if isinstance(key, str) else key: value
+            for key, value in config.items()}
+
+def _report_yaml_fallback():
+    """
+    Prints a one-time notice when the libyaml C loader is not available.
+    """
+    global _yaml_fallback_reported
+    if _USING_C_YAML or _yaml_fallback_reported:
+        return
+    _yaml_fallback_reported = True
+    # Sent to stderr so the notice does not mix with the command's output
+    info('YAML C loader unavailable; falling back to pure-Python SafeLoader',
+         file=sys.stderr)
+
+def _use_rich(stream):
+    """
+    Checks whether rich formatting should be used for a stream.
+
+    Args:
+        stream (file): The stream about to be written to.
+
+    Returns:
+        bool: True if the stream is a terminal, False otherwise.
+    """
+    isatty = getattr(stream, 'isatty', None)
+    return bool(isatty and isatty())
+
+def info(info_message, file=None):
     """
     Prints a Yellow informational message.
 
+    Plain text is printed when the stream is not a terminal.
+
     Args:
         info_message (str): The informational message to be printed.
+        file (file, optional): Stream to print to. Defaults to stdout.
     """
-    rich.print(f'[yellow]{info_message}[/yellow]')
+    file = file or sys.stdout
+    if _use_rich(file):
+        import rich
+        rich.print(f'[yellow]{info_message}[/yellow]', file=file)
+    else:
+        print(info_message, file=file)
 
 def error(error_message):
     """
-    Prints a Red error message and exits with exit code 1.
+    Prints a Red error message to stderr and exits with exit code 1.
+
+    Plain text is printed when stderr is not a terminal.
 
     Args:
         error_message (str): The error message to be printed.
@@ -221,7 +374,11 @@ def error(error_message):
     Raises:
         SystemExit: Exits the program due to the error
     """
-    rich.print(f'[red][bold]ERROR:[/bold] {error_message}[/red]')
+    if _use_rich(sys.stderr):
+        import rich
+        rich.print(f'[red][bold]ERROR:[/bold] {error_message}[/red]', file=sys.stderr)
+    else:
+        print(f'ERROR: {error_message}', file=sys.stderr)
     raise SystemExit(1)
 
 if __name__ == "__main__":